@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The backend imports its modules relative to this directory (services.*, logging_config)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
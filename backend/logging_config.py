@@ -1,5 +1,72 @@
 import logging
+import logging.handlers
 import os
+import queue
+import threading
+import time
+
+# Listeners that write queued records on background threads, stopped by shutdown_logging
+_listeners = []
+_flush_stop = threading.Event()
+# Queue handler -> wrapped handler, so shutdown_logging can put the real handlers back
+_queued_handlers = {}
+
+def _queued(handler: logging.Handler) -> logging.Handler:
+    """
+    Put a queue in front of a handler so callers only pay for an enqueue
+
+    The file or console write happens on the listener's thread. The queue handler
+    takes the wrapped handler's level, so filtered records are never queued.
+    """
+    log_queue = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(log_queue, handler, respect_handler_level=True)
+    listener.start()
+    _listeners.append(listener)
+
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    queue_handler.setLevel(handler.level)
+    _queued_handlers[queue_handler] = handler
+    return queue_handler
+
+class BufferedFileHandler(logging.FileHandler):
+    """
+    File handler that writes through a block buffer
+
+    FileHandler flushes after every record, costing one write() per line. Here
+    records accumulate and are flushed at most once per interval, except ERROR
+    and above, which are flushed straight away. Buffered lower-level records
+    reach the file within an interval through _flush_periodically, or on close.
+    """
+
+    def __init__(self, filename, flush_interval: float = 1.0, buffer_size: int = 64 * 1024):
+        self.flush_interval = flush_interval
+        self.buffer_size = buffer_size
+        self._last_flush = 0.0
+        # Files are only created once something is written to them
+        super().__init__(filename, delay=True)
+
+    def _open(self):
+        return open(self.baseFilename, self.mode, buffering=self.buffer_size, encoding=self.encoding, errors=self.errors)
+
+    def emit(self, record):
+        super().emit(record)
+        if record.levelno >= logging.ERROR:
+            self._flush_now()
+
+    def flush(self):
+        if time.monotonic() - self._last_flush >= self.flush_interval:
+            self._flush_now()
+
+    def _flush_now(self):
+        self._last_flush = time.monotonic()
+        super().flush()
+
+def _flush_periodically(handlers, interval: float):
+    """Flush buffered files on a timer so records do not sit in the buffer while logging is idle"""
+    while not _flush_stop.wait(interval):
+        for handler in handlers:
+            with handler.lock:
+                handler._flush_now()
 
 def setup_logging():
     """Setup logging configuration for the backend"""
@@ -24,43 +91,27 @@ def setup_logging():
     simple_formatter = logging.Formatter(
         '%(asctime)s - %(levelname)s - %(message)s'
     )
-    fraud_formatter = logging.Formatter(
-        '%(asctime)s - FRAUD - %(message)s'
-    )
-    normal_formatter = logging.Formatter(
-        '%(asctime)s - NORMAL - %(message)s'
-    )
     stats_formatter = logging.Formatter(
         '%(asctime)s - STATS - %(message)s'
     )
 
     # File handler for all logs
-    all_logs_handler = logging.FileHandler(f'{log_dir}/all.log')
+    all_logs_handler = BufferedFileHandler(f'{log_dir}/all.log')
     all_logs_handler.setLevel(logging.DEBUG)
     all_logs_handler.setFormatter(detailed_formatter)
     
     # File handler for errors only
-    error_logs_handler = logging.FileHandler(f'{log_dir}/errors.log')
+    error_logs_handler = BufferedFileHandler(f'{log_dir}/errors.log')
     error_logs_handler.setLevel(logging.ERROR)
     error_logs_handler.setFormatter(detailed_formatter)
     
     # File handler for Aerospike Graph specific logs
-    graph_logs_handler = logging.FileHandler(f'{log_dir}/graph.log')
+    graph_logs_handler = BufferedFileHandler(f'{log_dir}/graph.log')
     graph_logs_handler.setLevel(logging.DEBUG)
     graph_logs_handler.setFormatter(detailed_formatter)
 
-    # Separate file handler for fraud transactions
-    fraud_handler = logging.FileHandler(f'{log_dir}/fraud_transactions.log')
-    fraud_handler.setLevel(logging.ERROR)
-    fraud_handler.setFormatter(fraud_formatter)
-    
-    # Separate file handler for normal transactions
-    normal_handler = logging.FileHandler(f'{log_dir}/normal_transactions.log')
-    normal_handler.setLevel(logging.ERROR)
-    normal_handler.setFormatter(normal_formatter)
-    
     # Separate file handler for transaction stats
-    stats_handler = logging.FileHandler('logs/statistics.log')
+    stats_handler = BufferedFileHandler('logs/statistics.log')
     stats_handler.setLevel(logging.ERROR)
     stats_handler.setFormatter(stats_formatter)
 
@@ -69,10 +120,19 @@ def setup_logging():
     console_handler.setLevel(logging.ERROR)
     console_handler.setFormatter(simple_formatter)
 
-    # Add handlers to logger
+    buffered_handlers = [all_logs_handler, error_logs_handler, graph_logs_handler, stats_handler]
+    threading.Thread(target=_flush_periodically, args=(buffered_handlers, 1.0), name="log-flush", daemon=True).start()
+
+    # Writes happen off the calling thread
+    all_logs_handler = _queued(all_logs_handler)
+    error_logs_handler = _queued(error_logs_handler)
+    graph_logs_handler = _queued(graph_logs_handler)
+    stats_handler = _queued(stats_handler)
+    console_handler = _queued(console_handler)
+
+    # Add handlers to logger; graph.log is written only by the graph logger below
     logger.addHandler(all_logs_handler)
     logger.addHandler(error_logs_handler)
-    logger.addHandler(graph_logs_handler)
     logger.addHandler(console_handler)
     
     # Create specific loggers
@@ -88,19 +148,41 @@ def setup_logging():
     api_logger.addHandler(console_handler)
     api_logger.propagate = False  # Prevent propagation to parent logger
     
+    # Generator and stats records propagate to the parent, which already writes them to the console
     txn_logger = logging.getLogger('fraud_detection.transaction_generator')
     txn_logger.setLevel(logging.ERROR)
-    txn_logger.addHandler(normal_handler)
-    txn_logger.addHandler(fraud_handler)
-    txn_logger.addHandler(console_handler)
 
     stats_logger = logging.getLogger('fraud_detection.stats')
     stats_logger.setLevel(logging.ERROR)
     stats_logger.addHandler(stats_handler)
-    stats_logger.addHandler(console_handler)
     
     return logger
 
+def shutdown_logging():
+    """
+    Flush queued records, stop the listener and flush threads, and close the log files
+
+    Loggers get their real handlers back first, so records logged after shutdown
+    (batcher threads, server teardown) are written directly instead of queued
+    for a listener that no longer runs.
+    """
+    _flush_stop.set()
+
+    loggers = [logging.getLogger()] + [l for l in logging.Logger.manager.loggerDict.values() if isinstance(l, logging.Logger)]
+    for logger in loggers:
+        for handler in list(logger.handlers):
+            if handler in _queued_handlers:
+                logger.removeHandler(handler)
+                logger.addHandler(_queued_handlers[handler])
+
+    while _listeners:
+        _listeners.pop().stop()
+
+    for handler in _queued_handlers.values():
+        if isinstance(handler, BufferedFileHandler):
+            handler.close()
+    _queued_handlers.clear()
+
 def get_logger(name='fraud_detection'):
     """Get a logger instance"""
     return logging.getLogger(name) 
\ No newline at end of file
@@ -10,7 +10,7 @@ from services.graph_service import GraphService
 from services.transaction_generator import TransactionGeneratorService
 from services.performance_monitor import performance_monitor
 
-from logging_config import setup_logging, get_logger
+from logging_config import setup_logging, shutdown_logging, get_logger
 
 # Setup logging
 setup_logging()
@@ -35,6 +35,7 @@ async def lifespan(app: FastAPI):
     # Shutdown
     logger.info("Shutting down Fraud Detection API")
     graph_service.close()
+    shutdown_logging()
 
 app = FastAPI(
     title="Fraud Detection API",
@@ -274,9 +275,13 @@ def get_transaction_detail(transaction_id: str):
 @app.post("/transaction-generation/generate")
 def generate_random_transaction():
     try:
-        transaction_generator.generate_transaction()
+        txn_id, error, warning = transaction_generator.generate_transaction()
+        if error:
+            raise HTTPException(status_code=500, detail=f"Failed to generate transaction: {error}")
         return True
     
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"❌ Failed to generate transaction: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to generate transaction: {str(e)}")
@@ -341,8 +346,8 @@ def create_manual_transaction(
 ):
     """Create a manual transaction between specific accounts"""
     try:
-        logger.info(f"Attempting to create manual transaction from {from_account_id} to {to_account_id} amount {amount}")
-        result = transaction_generator.create_manual_transaction(
+        logger.info("Attempting to create manual transaction from %s to %s amount %s", from_account_id, to_account_id, amount)
+        txn_id, error, warning = transaction_generator.create_manual_transaction(
             from_id=from_account_id,
             to_id=to_account_id,
             amount=amount,
@@ -350,14 +355,17 @@ def create_manual_transaction(
             gen_type="MANUAL"
         )
         
-        if result:
+        if txn_id:
             logger.info(f"✅ Transaction created")
-            return {
+            response = {
                 "message": "Transaction created successfully",
             }
+            if warning:
+                response["warning"] = warning
+            return response
         else:
             logger.error("❌ Failed to create manual transaction")
-            raise HTTPException(status_code=400, detail="Failed to create transaction")
+            raise HTTPException(status_code=400, detail=f"Failed to create transaction: {error}")
             
     except HTTPException:
         raise
@@ -1,18 +1,49 @@
 import asyncio
 import logging
+import os
 import time
 import json
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime
-from typing import Dict, Any
+from typing import Dict, Any, List, Tuple
 from gremlin_python.process.graph_traversal import __
 
 from services.graph_service import GraphService
+from services.micro_batcher import MicroBatcher
 from services.performance_monitor import performance_monitor
 
 # Setup logging
 logger = logging.getLogger('fraud_detection.rt1')
 logger.setLevel(logging.ERROR)
 
+# Per-edge projections for each check. Only the edge ids change between calls,
+# so the child traversals are built once and reused by every batch.
+RT1_PROJECTION = {
+    "sender": __.outV().has("fraud_flag", True).id_(),
+    "receiver": __.inV().has("fraud_flag", True).id_()
+}
+
+RT2_PROJECTION = {
+    "sender": __.outV()
+        .both("TRANSACTS").dedup()
+        .has("fraud_flag", True).id_().fold(),
+    "receiver": __.inV()
+        .both("TRANSACTS").dedup()
+        .has("fraud_flag", True).id_().fold()
+}
+
+RT3_PROJECTION = {
+    "sender": __.outV().in_("OWNS").id_(),
+    "receiver": __.inV().in_("OWNS").id_(),
+    "accounts": __.bothV().in_("OWNS").out("OWNS")
+        .both("TRANSACTS").in_("OWNS").id_()
+        .dedup().fold(),
+    "devices": __.bothV().in_("OWNS").out("OWNS")
+        .both("TRANSACTS").in_("OWNS").out("USES")
+        .has("fraud_flag", True).id_()
+        .dedup().fold()
+}
+
 class FraudService:
     """Fraud Detection Service"""
     
@@ -21,6 +52,18 @@ class FraudService:
         self.rt1_enabled = True
         self.rt2_enabled = True
         self.rt3_enabled = True
+
+        # Checks run on their own threads rather than the graph executor, so API reads cannot hold them up.
+        # The batcher flushes one batch at a time, so one thread per check is enough
+        self.check_executor = ThreadPoolExecutor(max_workers=3, thread_name_prefix="fraud-check")
+
+        # Transactions submitted from concurrent requests share one traversal per check
+        self.batcher = MicroBatcher(
+            "fraud",
+            self.run_fraud_detection_batch,
+            max_batch_size=int(os.environ.get('FRAUD_BATCH_SIZE', 64)),
+            max_wait_ms=float(os.environ.get('FRAUD_BATCH_WAIT_MS', 5))
+        )
     
     
     # ----------------------------------------------------------------------------------------------------------
@@ -101,7 +144,7 @@ class FraudService:
                 .property("fraud_status", status)
                 .property("eval_timestamp", datetime.now().isoformat())
                 .property("details", details)
-                .next())
+                .iterate())
             
         except Exception as e:
             raise Exception(f"Error storing fraud result: {e}")
@@ -112,49 +155,66 @@ class FraudService:
     # ----------------------------------------------------------------------------------------------------------
 
 
+    def submit_fraud_detection(self, edge_id: str, txn_id: str) -> Future:
+        """Queue a transaction for the next batched fraud detection pass"""
+        return self.batcher.submit((edge_id, txn_id))
+
+    def wait_for_fraud_detection(self, edge_id: str, txn_id: str):
+        """Run a transaction through the next batched fraud detection pass and wait for it"""
+        return self.batcher.submit_and_wait((edge_id, txn_id))
+
     def run_fraud_detection(self, edge_id: str, txn_id: str):
         """Run fraud detection on the transaction"""
-        
+        error = self.run_fraud_detection_batch([(edge_id, txn_id)])[0]
+        if error:
+            raise error
+
+    def run_fraud_detection_batch(self, transactions: List[Tuple[str, str]]) -> List[Exception | None]:
+        """
+        Run fraud detection on a batch of (edge_id, txn_id) pairs
+
+        Each enabled check issues one traversal for the whole batch. Returns one
+        entry per transaction: None on success, or the exception raised for it.
+        """
         if not self.graph_service.client:
             logger.warning("⚠️ Graph client not available for fraud detection")
-            return
-        
-        try:
-            fraud_checks = {}
-            # Run RT1 fraud detection (flagged accounts)
-            if self.rt1_enabled:
-                rt1_fraud, rt1_reason, rt1_result = self.run_rt1_fraud_detection(edge_id, txn_id)
-                if rt1_fraud:
-                    fraud_checks["rt1"] = rt1_result
-                    logger.warning(f"🚨 RT1 FRAUD ALERT: {rt1_reason}")
-        
-        except Exception as e:
-            raise Exception(f"❌ Error in RT1 fraud detection for transaction {txn_id}: {e}")
-        
-        try:
-            # Run RT2 fraud detection (flagged devices)
-            if self.rt2_enabled:
-                rt2_fraud, rt2_reason, rt2_result = self.run_rt2_fraud_detection(edge_id, txn_id)
-                if rt2_fraud:
-                    fraud_checks["rt2"] = rt2_result
-                    logger.warning(f"🚨 RT2 FRAUD ALERT: {rt2_reason}")
+            return [None] * len(transactions)
         
-        except Exception as e:
-            raise Exception(f"❌ Error in RT2 fraud detection for transaction {txn_id}: {e}")
-
-        try:
-            # Run RT3 fraud detection (account velocity) for now
-            if self.rt3_enabled:
-                rt3_fraud, rt3_reason, rt3_result = self.run_rt3_fraud_detection(edge_id, txn_id)
-                if rt3_fraud: 
-                    fraud_checks["rt3"] = rt3_result
-                    logger.warning(f"🚨 RT3 FRAUD ALERT: {rt3_reason}")
-        
-        except Exception as e:
-            raise Exception(f"❌ Error in RT3 fraud detection for transaction {txn_id}: {e}")    
-        
-        if not fraud_checks == {}:
-            self._store_fraud_results(edge_id, fraud_checks)
+        fraud_checks = [{} for _ in transactions]
+        errors = [None] * len(transactions)
+        checks = [
+            ("rt1", self.rt1_enabled, self.run_rt1_fraud_detection_batch),
+            ("rt2", self.rt2_enabled, self.run_rt2_fraud_detection_batch),
+            ("rt3", self.rt3_enabled, self.run_rt3_fraud_detection_batch)
+        ]
+
+        # The checks are independent traversals, so they run side by side
+        pending = [
+            (check, self.check_executor.submit(run_check, transactions))
+            for check, enabled, run_check in checks if enabled
+        ]
+
+        for check, future in pending:
+            try:
+                results = future.result()
+            except Exception as e:
+                for i, (_, txn_id) in enumerate(transactions):
+                    errors[i] = errors[i] or Exception(f"❌ Error in {check.upper()} fraud detection for transaction {txn_id}: {e}")
+                continue
+
+            for i, (is_fraud, reason, result) in enumerate(results):
+                if is_fraud:
+                    fraud_checks[i][check] = result
+                    logger.warning("🚨 %s FRAUD ALERT: %s", check.upper(), reason)
+
+        for i, (edge_id, _) in enumerate(transactions):
+            if errors[i] is None and not fraud_checks[i] == {}:
+                try:
+                    self._store_fraud_results(edge_id, fraud_checks[i])
+                except Exception as e:
+                    errors[i] = e
+
+        return errors
                 
 
     # ----------------------------------------------------------------------------------------------------------
@@ -162,6 +222,15 @@ class FraudService:
     # ----------------------------------------------------------------------------------------------------------
 
 
+    def _query_edges(self, transactions: List[Tuple[str, str]], projection: Dict[str, Any]) -> Dict[Any, Dict[str, Any]]:
+        """Project every transaction edge in one traversal, keyed by edge id"""
+        if not transactions:
+            return {}
+        traversal = self.graph_service.client.E(*[edge_id for edge_id, _ in transactions]).project("edge", *projection).by(__.id_())
+        for by_traversal in projection.values():
+            traversal = traversal.by(by_traversal)
+        return {row["edge"]: row for row in traversal.to_list()}
+
     def run_rt1_fraud_detection(self, edge_id, txn_id) -> tuple[bool, str, Dict[str, Any]]:
         """
         RT1 Fraud Detection Service - Flagged Account Detection
@@ -169,57 +238,60 @@ class FraudService:
         Check if transaction involves flagged accounts (RT1)
         1. RT1 checks if the sender or receiver (accounts)of a transaction is flagged as fraudulent.
         """
-        start_time = time.time()
+        return self.run_rt1_fraud_detection_batch([(edge_id, txn_id)])[0]
+
+    def run_rt1_fraud_detection_batch(self, transactions: List[Tuple[str, str]]) -> List[tuple[bool, str, Dict[str, Any]]]:
+        """Run RT1 for a batch of (edge_id, txn_id) pairs with a single traversal"""
+        start_time = time.perf_counter()
         try:
-            connections = (self.graph_service.client.E(edge_id)
-                .project("sender", "receiver")
-                .by(__.outV().has("fraud_flag", True).id_())
-                .by(__.inV().has("fraud_flag", True).id_())
-                .next())
-
-            sender = connections.get("sender", None)
-            receiver = connections.get("receiver", None)
-
-            if not sender and not receiver:
-                execution_time = (time.time() - start_time) * 1000
-                performance_monitor.record_rt1_performance(execution_time, success=True)
-                
-                logger.info(f"✅ RT1 CHECK PASSED: Transaction {txn_id} - No flagged account connections")
-                return False, "No flagged accounts involved", None
-            
-            flagged_connections = []
-            
-            if sender:
-                flagged_connections.append(self._create_flagged_connection(sender, "sender", 100))
-            if receiver:
-                flagged_connections.append(self._create_flagged_connection(receiver, "receiver", 100))
-           
-            total_connections = len(flagged_connections)
-                
-            # Simple scoring: direct fraud = 100, transaction partners = 75
-            fraud_score = 100
-            status = "blocked"
-            reason = f"Connected to {total_connections} flagged account(s) - 'direct fraud'"
-            details = {
-                "flagged_connections": flagged_connections,
-                "detection_time": datetime.now().isoformat(),
-                "fraud_score": fraud_score,
-                "reason": reason,
-                "rule": "RT1_SingleLevelFlaggedAccountRule"
-            }            
-            fraud_result = self._create_fraud_result(fraud_score, status, details)
-
-            execution_time = (time.time() - start_time) * 1000
-            performance_monitor.record_rt1_performance(execution_time, success=True)
-            
-            return True, reason, fraud_result
-                
+            connections = self._query_edges(transactions, RT1_PROJECTION)
         except Exception as e:
-            execution_time = (time.time() - start_time) * 1000
-            performance_monitor.record_rt1_performance(execution_time, success=False)
+            execution_time = (time.perf_counter() - start_time) * 1000
+            results = []
+            for _, txn_id in transactions:
+                performance_monitor.record_rt1_performance(execution_time, success=False)
+                logger.error("❌ Error in RT1 fraud detection for transaction %s: %s", txn_id, e)
+                results.append((False, f"Detection error: {str(e)}", None))
+            return results
+
+        execution_time = (time.perf_counter() - start_time) * 1000
+        results = []
+        for edge_id, txn_id in transactions:
+            results.append(self._evaluate_rt1(connections.get(edge_id, {}), txn_id))
+            performance_monitor.record_rt1_performance(execution_time, success=True)
+        return results
+
+    def _evaluate_rt1(self, connections: Dict[str, Any], txn_id) -> tuple[bool, str, Dict[str, Any]]:
+        sender = connections.get("sender", None)
+        receiver = connections.get("receiver", None)
+
+        if not sender and not receiver:
+            logger.info("✅ RT1 CHECK PASSED: Transaction %s - No flagged account connections", txn_id)
+            return False, "No flagged accounts involved", None
+        
+        flagged_connections = []
+        
+        if sender:
+            flagged_connections.append(self._create_flagged_connection(sender, "sender", 100))
+        if receiver:
+            flagged_connections.append(self._create_flagged_connection(receiver, "receiver", 100))
+       
+        total_connections = len(flagged_connections)
             
-            logger.error(f"❌ Error in RT1 fraud detection for transaction {txn_id}: {e}")
-            return False, f"Detection error: {str(e)}", None
+        # Simple scoring: direct fraud = 100, transaction partners = 75
+        fraud_score = 100
+        status = "blocked"
+        reason = f"Connected to {total_connections} flagged account(s) - 'direct fraud'"
+        details = {
+            "flagged_connections": flagged_connections,
+            "detection_time": datetime.now().isoformat(),
+            "fraud_score": fraud_score,
+            "reason": reason,
+            "rule": "RT1_SingleLevelFlaggedAccountRule"
+        }            
+        fraud_result = self._create_fraud_result(fraud_score, status, details)
+
+        return True, reason, fraud_result
 
 
     def run_rt2_fraud_detection(self, edge_id, txn_id) -> tuple[bool, str, Dict[str, Any]]:
@@ -230,64 +302,59 @@ class FraudService:
         1. RT2 checks if sender or receiver accounts have other transactions with accounts flagged as fraud
         2. Calculate a fraud score based on the number of such connections
         """
-        start_time = time.time()
+        return self.run_rt2_fraud_detection_batch([(edge_id, txn_id)])[0]
+
+    def run_rt2_fraud_detection_batch(self, transactions: List[Tuple[str, str]]) -> List[tuple[bool, str, Dict[str, Any]]]:
+        """Run RT2 for a batch of (edge_id, txn_id) pairs with a single traversal"""
+        start_time = time.perf_counter()
         try:
-            connections = (self.graph_service.client.E(edge_id)
-                .project("sender", "receiver")
-                .by(__.outV()
-                        .bothE("TRANSACTS").bothV()
-                        .has("fraud_flag", True).id_().dedup().fold())
-                .by(__.inV()
-                        .bothE("TRANSACTS").bothV()
-                        .has("fraud_flag", True).id_().dedup().fold())
-                .next())
-                    
-            sender = connections.get("sender", [])
-            receiver = connections.get("receiver", [])
-
-            if len(sender) < 1 and len(receiver) < 1:
-                execution_time = (time.time() - start_time) * 1000
-                performance_monitor.record_rt2_performance(execution_time, success=True)
-                
-                logger.info(f"✅ RT2 CHECK PASSED: Transaction {txn_id} - No flagged account connections")
-                return False, "No flagged accounts involved", None
-            
-            flagged_connections = []
-            
-            if len(sender) > 0:
-                for conn in sender:    
-                    flagged_connections.append(self._create_flagged_connection(conn, "sender_txn_partner", 75))
-            if len(receiver) > 0:
-                for conn in receiver:          
-                    flagged_connections.append(self._create_flagged_connection(conn, "receiver_txn_partner", 75))
-           
-            total_connections = len(flagged_connections)
-                
-            # Simple scoring: direct fraud = 100, transaction partners = 75
-            fraud_score = min(75 + total_connections * 5, 95)
-            status = "blocked" if fraud_score >= 90 else "review"
-            reason = f"Connected to {total_connections} flagged account(s) - transaction partners"
-            details = {
-                "flagged_connections": flagged_connections,
-                "total_connections": total_connections,
-                "detection_time": datetime.now().isoformat(),
-                "fraud_score": fraud_score,
-                "reason": reason,
-                "rule": "RT2_MultiLevelFlaggedAccountRule"
-            }            
-            fraud_result = self._create_fraud_result(fraud_score, status, details)
-
-            execution_time = (time.time() - start_time) * 1000
-            performance_monitor.record_rt2_performance(execution_time, success=True)
-            
-            return True, reason, fraud_result
-                
+            connections = self._query_edges(transactions, RT2_PROJECTION)
         except Exception as e:
-            execution_time = (time.time() - start_time) * 1000
-            performance_monitor.record_rt2_performance(execution_time, success=False)
+            execution_time = (time.perf_counter() - start_time) * 1000
+            results = []
+            for _, txn_id in transactions:
+                performance_monitor.record_rt2_performance(execution_time, success=False)
+                logger.error("❌ Error in RT2 fraud detection for transaction %s: %s", txn_id, e)
+                results.append((False, f"Detection error: {str(e)}", None))
+            return results
+
+        execution_time = (time.perf_counter() - start_time) * 1000
+        results = []
+        for edge_id, txn_id in transactions:
+            results.append(self._evaluate_rt2(connections.get(edge_id, {}), txn_id))
+            performance_monitor.record_rt2_performance(execution_time, success=True)
+        return results
+
+    def _evaluate_rt2(self, connections: Dict[str, Any], txn_id) -> tuple[bool, str, Dict[str, Any]]:
+        sender = connections.get("sender", [])
+        receiver = connections.get("receiver", [])
+
+        if len(sender) < 1 and len(receiver) < 1:
+            logger.info("✅ RT2 CHECK PASSED: Transaction %s - No flagged account connections", txn_id)
+            return False, "No flagged accounts involved", None
+        
+        flagged_connections = (
+            [self._create_flagged_connection(conn, "sender_txn_partner", 75) for conn in sender] +
+            [self._create_flagged_connection(conn, "receiver_txn_partner", 75) for conn in receiver]
+        )
+       
+        total_connections = len(flagged_connections)
             
-            logger.error(f"❌ Error in RT2 fraud detection for transaction {txn_id}: {e}")
-            return False, f"Detection error: {str(e)}", None
+        # Simple scoring: direct fraud = 100, transaction partners = 75
+        fraud_score = min(75 + total_connections * 5, 95)
+        status = "blocked" if fraud_score >= 90 else "review"
+        reason = f"Connected to {total_connections} flagged account(s) - transaction partners"
+        details = {
+            "flagged_connections": flagged_connections,
+            "total_connections": total_connections,
+            "detection_time": datetime.now().isoformat(),
+            "fraud_score": fraud_score,
+            "reason": reason,
+            "rule": "RT2_MultiLevelFlaggedAccountRule"
+        }            
+        fraud_result = self._create_fraud_result(fraud_score, status, details)
+
+        return True, reason, fraud_result
 
 
     def run_rt3_fraud_detection(self, edge_id, txn_id) -> tuple[bool, str, Dict[str, Any] | None]:
@@ -297,57 +364,52 @@ class FraudService:
         Check if transaction involves accounts connected to flagged devices
         Now checks connected accounts through transaction history, not just direct participants
         """
+        return self.run_rt3_fraud_detection_batch([(edge_id, txn_id)])[0]
 
-        start_time = time.time()
+    def run_rt3_fraud_detection_batch(self, transactions: List[Tuple[str, str]]) -> List[tuple[bool, str, Dict[str, Any] | None]]:
+        """Run RT3 for a batch of (edge_id, txn_id) pairs with a single traversal"""
+        start_time = time.perf_counter()
         try:
-            results = (self.graph_service.client.E(edge_id)
-                .project("sender", "receiver", "accounts", "devices")
-                .by(__.outV().in_("OWNS").id_())
-                .by(__.inV().in_("OWNS").id_())
-                .by(__.bothV().in_("OWNS").out("OWNS")
-                    .both("TRANSACTS").in_("OWNS").id_()
-                    .dedup().fold())
-                .by(__.bothV().in_("OWNS").out("OWNS")
-                    .both("TRANSACTS").in_("OWNS").out("USES")
-                    .has("fraud_flag", True).id_()
-                    .dedup().fold())
-                .next())
-                    
-            sender = results.get("sender", "")
-            receiver = results.get("receiver", "")
-            accounts = results.get("accounts", [])
-            devices = results.get("devices", [])
-
-            if len(devices) < 1:
-                execution_time = (time.time() - start_time) * 1000
-                performance_monitor.record_rt3_performance(execution_time, success=True)
-                
-                logger.info(f"✅ RT3: Transaction {txn_id} passed flagged device check in transaction network")              
-                return False, "No flagged devices connected to transaction network", None
-            
-            fraud_score = 85
-            reason = f"Transaction involves accounts connected to flagged devices in transaction network: {', '.join(devices)}"
-            details = {
-                "flagged_devices": devices,
-                "sender_account": sender,
-                "receiver_account": receiver,
-                "connected_accounts_checked": len(accounts),
-                "detection_time": datetime.now().isoformat(),
-                "fraud_score": fraud_score,
-                "reason": reason,
-                "rule": "RT3_FlaggedDeviceConnection"
-            }
-            fraud_result = self._create_fraud_result(fraud_score, "review", details)
-            
-            execution_time = (time.time() - start_time) * 1000
+            results_by_edge = self._query_edges(transactions, RT3_PROJECTION)
+        except Exception as e:
+            execution_time = (time.perf_counter() - start_time) * 1000  # Convert to milliseconds
+            results = []
+            for _, txn_id in transactions:
+                performance_monitor.record_rt3_performance(execution_time, success=False)
+                logger.error("❌ RT3: Error checking transaction %s: %s", txn_id, e)
+                logger.error("📊 RT3 Error - Total execution time: %.2fms before failure", execution_time)
+                results.append((False, f"RT3 check failed: {str(e)}", None))
+            return results
+
+        execution_time = (time.perf_counter() - start_time) * 1000
+        results = []
+        for edge_id, txn_id in transactions:
+            results.append(self._evaluate_rt3(results_by_edge.get(edge_id, {}), txn_id))
             performance_monitor.record_rt3_performance(execution_time, success=True)
+        return results
 
-            return True, reason, fraud_result
-                
-        except Exception as e:
-            execution_time = (time.time() - start_time) * 1000  # Convert to milliseconds
-            performance_monitor.record_rt3_performance(execution_time, success=False)
-            
-            logger.error(f"❌ RT3: Error checking transaction {txn_id}: {e}")
-            logger.error(f"📊 RT3 Error - Total execution time: {execution_time:.2f}ms before failure")
-            return False, f"RT3 check failed: {str(e)}", None
+    def _evaluate_rt3(self, results: Dict[str, Any], txn_id) -> tuple[bool, str, Dict[str, Any] | None]:
+        sender = results.get("sender", "")
+        receiver = results.get("receiver", "")
+        accounts = results.get("accounts", [])
+        devices = results.get("devices", [])
+
+        if len(devices) < 1:
+            logger.info("✅ RT3: Transaction %s passed flagged device check in transaction network", txn_id)              
+            return False, "No flagged devices connected to transaction network", None
+        
+        fraud_score = 85
+        reason = f"Transaction involves accounts connected to flagged devices in transaction network: {', '.join(devices)}"
+        details = {
+            "flagged_devices": devices,
+            "sender_account": sender,
+            "receiver_account": receiver,
+            "connected_accounts_checked": len(accounts),
+            "detection_time": datetime.now().isoformat(),
+            "fraud_score": fraud_score,
+            "reason": reason,
+            "rule": "RT3_FlaggedDeviceConnection"
+        }
+        fraud_result = self._create_fraud_result(fraud_score, "review", details)
+
+        return True, reason, fraud_result
@@ -1,5 +1,6 @@
 import asyncio
-from typing import List, Dict, Any, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Dict, Any, Optional
 from datetime import datetime
 import logging
 import os
@@ -15,13 +16,62 @@ from gremlin_python.process.traversal import P, T, Order, containing, Scope
 # Get logger for graph service
 logger = logging.getLogger('fraud_detection.graph')
 
+class CachedRead:
+    """
+    A graph read reused for a window
+
+    Graph data only changes on data load. A read made while a bulk load is
+    running is returned but not cached, and a cached read is dropped when a
+    load starts or completes.
+    """
+
+    def __init__(self, graph_service: "GraphService", ttl: float, read: Callable[[], Any]):
+        self.graph_service = graph_service
+        self.ttl = ttl
+        self.read = read
+        self._entry = (0.0, None, None)  # (expiry, data_version, value), replaced as a whole
+
+    def _is_current(self, entry) -> bool:
+        expiry, version, _ = entry
+        return time.monotonic() < expiry and version == self.graph_service.data_version
+
+    def get(self) -> Any:
+        entry = self._entry
+        if self._is_current(entry):
+            return entry[2]
+
+        loading = self.graph_service.is_bulk_load_running()
+        version = self.graph_service.data_version
+        value = self.read()
+        if not loading and version == self.graph_service.data_version:
+            self._entry = (time.monotonic() + self.ttl, version, value)
+        return value
+
+    def clear(self):
+        self._entry = (0.0, None, None)
+
 class GraphService:
     def __init__(self, host: str = os.environ.get('GRAPH_HOST_ADDRESS') or 'localhost', port: int = 8182):
         self.host = host
         self.port = port
+        # Connections in the driver's pool; the default is the driver's own, GRAPH_POOL_SIZE only makes it tunable.
+        # The gremlin executor is sized from it too
+        self.pool_size = int(os.environ.get('GRAPH_POOL_SIZE', 8))
         self.client = None
         self.connection = None
+        self.executor = None
         self.users_data = []
+
+        # A bulk load only starts a server-side job, so reads are not cached until it reports completion
+        self.bulk_load_status_interval = 5.0  # Seconds between bulk load status polls
+        self._bulk_load_running = False
+        self._bulk_load_checked = 0.0
+        self.data_version = 0  # Bumped when a bulk load completes, so other services know to reload their copies
+
+        # Listings are reused for up to five minutes; loads invalidate them sooner
+        self._cached_reads = []
+        self._accounts = self.cached_read(300, self._read_accounts)
+        self._user_stats = self.cached_read(300, self._read_user_stats)
     
 
     # ----------------------------------------------------------------------------------------------------------
@@ -31,13 +81,25 @@ class GraphService:
 
     def connect(self):
         """Synchronous connection to Aerospike Graph (to be called outside async context)"""
+        # The traversal source owns the connection pool; every service shares this one
+        if self.client:
+            return True
+
         try:
             url = f'ws://{self.host}:{self.port}/gremlin'
             logger.info(f"🔄 Connecting to Aerospike Graph: {url}")
             
             # Use the same approach as the working sample
-            self.connection = DriverRemoteConnection(url, "g", transport_factory=lambda:AiohttpTransport(call_from_event_loop=True))
+            self.connection = DriverRemoteConnection(
+                url, "g",
+                pool_size=self.pool_size,
+                max_workers=self.pool_size,
+                transport_factory=lambda:AiohttpTransport(call_from_event_loop=True)
+            )
             self.client = traversal().with_remote(self.connection)
+
+            # Blocking traversals from async endpoints get their own pool, sized to the connections
+            self.executor = ThreadPoolExecutor(max_workers=self.pool_size, thread_name_prefix="gremlin")
             
             # Test connection using the same method as the sample
             test_result = self.client.inject(0).next()
@@ -52,8 +114,35 @@ class GraphService:
             logger.error("Graph database connection is required. Please ensure Aerospike Graph is running on port 8182")
             self.client = None
             self.connection = None
+            self.executor = None
             raise Exception(f"Failed to connect to Aerospike Graph: {e}")
 
+    def ensure_indexes(self):
+        """Create the property indexes that flagged-entity lookups use as traversal entry points"""
+        try:
+            indexes = self.client.call("aerospike.graph.admin.index.list").to_list()
+            # The listing may come back as one list result or one result per index
+            if len(indexes) == 1 and isinstance(indexes[0], list):
+                indexes = indexes[0]
+            has_index = any(
+                isinstance(index, dict)
+                and index.get("element_type") == "vertex"
+                and index.get("property_key") == "fraud_flag"
+                for index in indexes
+            )
+            if not has_index:
+                (self.client.call("aerospike.graph.admin.index.create")
+                    .with_("element_type", "vertex")
+                    .with_("property_key", "fraud_flag")
+                    .next())
+                logger.info("✅ Created vertex index on fraud_flag")
+        except Exception as e:
+            logger.warning(f"⚠️  Unable to create fraud_flag index: {e}")
+
+    async def _run_in_executor(self, fn):
+        """Run a blocking traversal on the graph executor"""
+        return await asyncio.get_running_loop().run_in_executor(self.executor, fn)
+
     def close(self):
         """Synchronous close of graph connection"""
         if self.connection:
@@ -62,6 +151,11 @@ class GraphService:
                 logger.info("✅ Disconnected from Aerospike Graph")
             except Exception as e:
                 logger.warning(f"⚠️  Error closing connection: {e}")
+            self.client = None
+            self.connection = None
+        if self.executor:
+            self.executor.shutdown(wait=False)
+            self.executor = None
 
 
     # ----------------------------------------------------------------------------------------------------------
@@ -273,16 +367,10 @@ class GraphService:
 
         
     def get_user_stats(self) -> Dict[str, Any]:
-        """Get user statistics"""
+        """Get user statistics, cached for a window"""
         try:
             if self.client:
-                stats = self.client.V().has_label("user").values('risk_score').to_list()
-                return {
-                    'total_users': len(stats),
-                    'total_low_risk': len(list(filter(lambda x: x < 25, stats))),
-                    'total_med_risk': len(list(filter(lambda x: x >= 25 and x < 70, stats))),
-                    'total_high_risk': len(list(filter(lambda x: x >= 70, stats)))
-                }
+                return self._user_stats.get()
             else:
                 # No graph client available
                 raise Exception("Graph client not available. Cannot get users without graph database connection.")
@@ -297,6 +385,16 @@ class GraphService:
             }
 
 
+    def _read_user_stats(self) -> Dict[str, Any]:
+        """Count users per risk band in one pass over their risk scores"""
+        stats = self.client.V().has_label("user").values('risk_score').to_list()
+        return {
+            'total_users': len(stats),
+            'total_low_risk': sum(1 for x in stats if x < 25),
+            'total_med_risk': sum(1 for x in stats if 25 <= x < 70),
+            'total_high_risk': sum(1 for x in stats if x >= 70)
+        }
+
     def get_user_summary(self, user_id: str) -> Dict[str, Any]:
         """Get user's profile, connected accounts, and transaction summary"""
         try:
@@ -473,12 +571,10 @@ class GraphService:
 
 
     def get_all_accounts(self) -> List[Dict[str, Any]]:
-        """Get all accounts with their associated user information"""
+        """Get all accounts with their associated user information, cached for a window"""
         try:
             if self.client:
-                accounts = self.client.V().has_label("account").project("account_id", "account_type").by(T.id).by("type").to_list()
-                logger.info(f"Found {len(accounts)} account vertices")
-                return accounts
+                return self._accounts.get()
             else:
                 return []
                 
@@ -486,24 +582,29 @@ class GraphService:
             logger.error(f"Error getting all accounts: {e}")
             return []
         
+    def _read_accounts(self) -> List[Dict[str, Any]]:
+        """Read the account listing"""
+        accounts = self.client.V().has_label("account").project("account_id", "account_type").by(T.id).by("type").to_list()
+        logger.info(f"Found {len(accounts)} account vertices")
+        return accounts
+
     async def flag_account(self, account_id: str, reason: str) -> bool:
         """Flag an account as fraudulent"""
         try:
             if not self.client:
                 raise Exception("Graph client not available")
             
-            loop = asyncio.get_event_loop()
-            
             def flag_account_sync():
                 try:
-                    # Find and update account
-                    accounts = self.client.V().has_label("account").has("account_id", account_id).to_list()
-                    if not accounts:
+                    # Find and update account by vertex id in a single traversal
+                    updated = (self.client.V(account_id).has_label("account")
+                        .property("fraud_flag", True)
+                        .property("flagReason", reason)
+                        .property("flagTimestamp", datetime.now().isoformat())
+                        .id_().to_list())
+                    if not updated:
                         return False
                     
-                    account_vertex = accounts[0]
-                    self.client.V(account_vertex).property("fraud_flag", True).property("flagReason", reason).property("flagTimestamp", datetime.now().isoformat()).iterate()
-                    
                     logger.info(f"🚩 Account {account_id} flagged as fraudulent: {reason}")
                     return True
                     
@@ -511,7 +612,7 @@ class GraphService:
                     logger.error(f"Error flagging account {account_id}: {e}")
                     return False
             
-            return await loop.run_in_executor(None, flag_account_sync)
+            return await self._run_in_executor(flag_account_sync)
             
         except Exception as e:
             logger.error(f"Error in flag_account: {e}")
@@ -523,18 +624,16 @@ class GraphService:
             if not self.client:
                 raise Exception("Graph client not available")
             
-            loop = asyncio.get_event_loop()
-            
             def unflag_account_sync():
                 try:
-                    # Find and update account
-                    accounts = self.client.V().has_label("account").has("account_id", account_id).to_list()
-                    if not accounts:
+                    # Find and update account by vertex id in a single traversal
+                    updated = (self.client.V(account_id).has_label("account")
+                        .property("fraud_flag", False)
+                        .property("unflagTimestamp", datetime.now().isoformat())
+                        .id_().to_list())
+                    if not updated:
                         return False
                     
-                    account_vertex = accounts[0]
-                    self.client.V(account_vertex).property("fraud_flag", False).property("unflagTimestamp", datetime.now().isoformat()).iterate()
-                    
                     logger.info(f"✅ Account {account_id} unflagged")
                     return True
                     
@@ -542,7 +641,7 @@ class GraphService:
                     logger.error(f"Error unflagging account {account_id}: {e}")
                     return False
             
-            return await loop.run_in_executor(None, unflag_account_sync)
+            return await self._run_in_executor(unflag_account_sync)
             
         except Exception as e:
             logger.error(f"Error in unflag_account: {e}")
@@ -554,24 +653,15 @@ class GraphService:
             if not self.client:
                 raise Exception("Graph client not available")
             
-            loop = asyncio.get_event_loop()
-            
             def get_flagged_sync():
                 try:
                     flagged_accounts = []
-                    accounts = self.client.V().has_label("account").has("fraud_flag", True).to_list()
+                    # One round trip for every flagged account and its properties
+                    accounts = self.client.V().has_label("account").has("fraud_flag", True).element_map().to_list()
                     
-                    for account_vertex in accounts:
-                        account_props = {}
-                        props = self.client.V(account_vertex).value_map().next()
-                        for key, value in props.items():
-                            if isinstance(value, list) and len(value) > 0:
-                                account_props[key] = value[0]
-                            else:
-                                account_props[key] = value
-                        
+                    for account_props in accounts:
                         flagged_accounts.append({
-                            "account_id": account_props.get("account_id", ""),
+                            "account_id": account_props.get(T.id, ""),
                             "type": account_props.get("type", ""),
                             "balance": account_props.get("balance", 0.0),
                             "flag_reason": account_props.get("flagReason", ""),
@@ -585,7 +675,7 @@ class GraphService:
                     logger.error(f"Error getting flagged accounts: {e}")
                     return []
             
-            return await loop.run_in_executor(None, get_flagged_sync)
+            return await self._run_in_executor(get_flagged_sync)
             
         except Exception as e:
             logger.error(f"Error in get_flagged_accounts: {e}")
@@ -597,8 +687,6 @@ class GraphService:
             if not self.client:
                 raise Exception("Graph client not available")
             
-            loop = asyncio.get_event_loop()
-            
             def get_flagged_transactions_sync():
                 try:
                     # Get all transactions that have fraud_status property (indicating fraud detection was performed)
@@ -699,7 +787,7 @@ class GraphService:
                         'total_pages': 0
                     }
             
-            return await loop.run_in_executor(None, get_flagged_transactions_sync)
+            return await self._run_in_executor(get_flagged_transactions_sync)
             
         except Exception as e:
             logger.error(f"Error in get_flagged_transactions_paginated: {e}")
@@ -717,8 +805,6 @@ class GraphService:
             if not self.client:
                 raise Exception("Graph client not available")
             
-            loop = asyncio.get_event_loop()
-            
             def create_relationship_sync():
                 try:
                     # Find both accounts
@@ -741,7 +827,7 @@ class GraphService:
                     logger.error(f"Error creating transfer relationship: {e}")
                     return False
             
-            return await loop.run_in_executor(None, create_relationship_sync)
+            return await self._run_in_executor(create_relationship_sync)
             
         except Exception as e:
             logger.error(f"Error in create_transfer_relationship: {e}")
@@ -753,8 +839,6 @@ class GraphService:
             if not self.client:
                 raise Exception("Graph client not available")
             
-            loop = asyncio.get_event_loop()
-            
             def get_results_sync():
                 try:
                     # Get all transactions that have fraud properties (fraud detection was performed)
@@ -799,7 +883,7 @@ class GraphService:
                         "total_pages": 0
                     }
             
-            return await loop.run_in_executor(None, get_results_sync)
+            return await self._run_in_executor(get_results_sync)
             
         except Exception as e:
             logger.error(f"Error in get_fraud_check_results_paginated: {e}")
@@ -817,8 +901,6 @@ class GraphService:
             if not self.client:
                 raise Exception("Graph client not available")
             
-            loop = asyncio.get_event_loop()
-            
             def get_transaction_results_sync():
                 try:
                     results_data = []
@@ -845,9 +927,9 @@ class GraphService:
                             "reason": self.get_property_value(transaction_vertex, 'reason', ''),
                             "details": self.get_property_value(transaction_vertex, 'details', '')
                         })
-                        logger.info(f"Found fraud results for transaction {transaction_id}: status={fraud_status}, score={fraud_score}")
+                        logger.info("Found fraud results for transaction %s: status=%s, score=%s", transaction_id, fraud_status, fraud_score)
                     else:
-                        logger.info(f"No fraud results found for transaction {transaction_id} - transaction is clean")
+                        logger.info("No fraud results found for transaction %s - transaction is clean", transaction_id)
                     
                     return results_data
                     
@@ -855,7 +937,7 @@ class GraphService:
                     logger.error(f"Error getting transaction fraud results: {e}")
                     return []
             
-            return await loop.run_in_executor(None, get_transaction_results_sync)
+            return await self._run_in_executor(get_transaction_results_sync)
             
         except Exception as e:
             logger.error(f"Error in get_transaction_fraud_results: {e}")
@@ -879,6 +961,7 @@ class GraphService:
                 edges_path = "/data/graph_csv/edges"
             
             logger.info(f"Starting bulk load with vertices path: {vertices_path}, edges path: {edges_path}")
+            self.ensure_indexes()
             
             bulk_load_result = {}
             try:
@@ -893,6 +976,9 @@ class GraphService:
                 
                 logger.info("Bulk load operation started successfully")
                 bulk_load_result["success"] = True
+                self._bulk_load_running = True
+                self._bulk_load_checked = time.monotonic()
+                self._clear_cached_reads()
 
             except Exception as e:
                 logger.error(f"Bulk load failed: {e}")
@@ -1030,6 +1116,38 @@ class GraphService:
                 "error": str(e)
             }
 
+    def cached_read(self, ttl: float, read: Callable[[], Any]) -> CachedRead:
+        """Wrap a graph read so it is reused for ttl seconds and follows bulk loads"""
+        cached = CachedRead(self, ttl, read)
+        self._cached_reads.append(cached)
+        return cached
+
+    def _clear_cached_reads(self):
+        for cached in self._cached_reads:
+            cached.clear()
+
+    def is_bulk_load_running(self) -> bool:
+        """Whether a bulk load started by this service is still running, polling its status at most once per interval"""
+        if not self._bulk_load_running:
+            return False
+
+        now = time.monotonic()
+        if now - self._bulk_load_checked >= self.bulk_load_status_interval:
+            self._bulk_load_checked = now
+            try:
+                status_result = self.client.call("aerospike.graphloader.admin.bulk-load.status").next()
+                if status_result.get("complete", False):
+                    self._bulk_load_completed()
+            except Exception as e:
+                logger.error(f"Error checking bulk load status: {e}")
+        return self._bulk_load_running
+
+    def _bulk_load_completed(self):
+        """Move to a new data version, which drops every cached read so the next ones see the loaded graph"""
+        logger.info("Bulk load complete, clearing cached graph reads")
+        self._bulk_load_running = False
+        self.data_version += 1
+
     def get_bulk_load_status(self) -> Dict[str, Any]:
         """Get the status of the current bulk load operation using Aerospike Graph Status API"""
         try:
@@ -1056,6 +1174,9 @@ class GraphService:
             
             # Clean up None values
             status_info = {k: v for k, v in status_info.items() if v is not None}
+
+            if status_info["complete"] and self._bulk_load_running:
+                self._bulk_load_completed()
             
             logger.info(f"Bulk load status: {status_info['status']} - {status_info['step']}")
             
@@ -0,0 +1,89 @@
+"""
+Micro-Batching Service
+Coalesces individually submitted work items into batched calls
+
+Request threads submit one item at a time and block on the returned future.
+A background worker drains the queue every few milliseconds and hands the
+whole batch to a single handler call, so N concurrent transactions cost one
+Gremlin round trip instead of N.
+"""
+
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from typing import Any, Callable, List
+
+# Setup logging
+logger = logging.getLogger('fraud_detection.batcher')
+
+class MicroBatcher:
+    """Collects submitted items and flushes them to a batch handler"""
+
+    def __init__(self, name: str, handler: Callable[[List[Any]], List[Any]],
+                 max_batch_size: int = 64, max_wait_ms: float = 5, result_timeout: float = 30):
+        self.name = name
+        self.handler = handler
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.result_timeout = result_timeout
+        self._queue = queue.SimpleQueue()
+        self._lock = threading.Lock()
+        self._worker = None
+
+    def submit(self, item: Any) -> Future:
+        """Queue an item and return a future resolved with its batch result"""
+        future = Future()
+        self._queue.put((item, future))
+        if self._worker is None:
+            self._start_worker()
+        return future
+
+    def submit_and_wait(self, item: Any) -> Any:
+        """Queue an item and wait up to result_timeout seconds for its batch result"""
+        try:
+            return self.submit(item).result(timeout=self.result_timeout)
+        except FutureTimeoutError:
+            raise TimeoutError(f"{self.name} batch result not ready after {self.result_timeout}s") from None
+
+    def _start_worker(self):
+        with self._lock:
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, name=f"{self.name}-batcher", daemon=True)
+                self._worker.start()
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                try:
+                    batch.append(self._queue.get(timeout=max(0, deadline - time.monotonic())))
+                except queue.Empty:
+                    break
+            self._flush(batch)
+
+    def _flush(self, batch):
+        """Run the handler once for the batch and resolve every pending future.
+
+        The handler returns one result per item; an Exception instance in the
+        result list fails only that item's future. Anything else the handler does
+        wrong fails the whole batch, so no caller is left waiting and the worker
+        thread keeps running.
+        """
+        try:
+            results = self.handler([item for item, _ in batch])
+            if len(results) != len(batch):
+                raise RuntimeError(f"{self.name} handler returned {len(results)} results for {len(batch)} items")
+        except Exception as e:
+            logger.error("❌ %s batch of %d failed: %r", self.name, len(batch), e)
+            for _, future in batch:
+                future.set_exception(e)
+            return
+
+        for (_, future), result in zip(batch, results):
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
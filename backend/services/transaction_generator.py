@@ -2,18 +2,25 @@ import asyncio
 import random
 import pickle
 import math
+import os
+import threading
 import time
 from datetime import datetime
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Sequence, Tuple
 from enum import Enum
 import json
-import uuid
+import logging
+import numpy as np
+from collections import deque
+from itertools import islice
 from gremlin_python.process.graph_traversal import __
+from gremlin_python.process.traversal import Scope
 from concurrent.futures import ThreadPoolExecutor
 
 # Import local modules
 from services.fraud_service import FraudService
 from services.graph_service import GraphService
+from services.micro_batcher import MicroBatcher
 from logging_config import get_logger
 
 logger = get_logger('fraud_detection.transaction_generator')
@@ -29,61 +36,145 @@ class FraudScenario(Enum):
     SCENARIO_G = "International Transfers to High-Risk Jurisdictions"
     SCENARIO_H = "Region-Specific Fraud (Indian Context)"
 
+# Persisted settings; store.pckl is the pickle file used by earlier versions
+STORE_PATH = 'store.json'
+LEGACY_STORE_PATH = 'store.pckl'
+
 def get_stored_max_transaction_rate():
     try:
-        file = open('store.pckl', 'rb')
-        obj = pickle.load(file)
-        file.close()
-        return obj.get("rate", 50)
-    except:
+        with open(STORE_PATH) as file:
+            return json.load(file).get("rate", 50)
+    except FileNotFoundError:
+        pass
+    except Exception:
+        return 50
+
+    # One-time migration of a rate saved by an earlier version
+    try:
+        with open(LEGACY_STORE_PATH, 'rb') as file:
+            rate = pickle.load(file).get("rate", 50)
+        with open(STORE_PATH, 'w') as file:
+            json.dump({"rate": rate}, file)
+        return rate
+    except Exception:
         return 50
 
+# TRANSACTS edge properties copied from each transaction row, and the ones every edge shares
+TRANSACTION_PROPERTIES = ("txn_id", "amount", "type", "location", "timestamp", "gen_type")
+CONSTANT_TRANSACTION_PROPERTIES = (("currency", "USD"), ("method", "electronic_transfer"), ("status", "completed"))
+
+# (millisecond, ISO string) of the last formatted transaction timestamp
+_timestamp_cache = (0, "")
+
+def current_timestamp() -> str:
+    """ISO timestamp for now, formatted at most once per millisecond"""
+    global _timestamp_cache
+    now_ms = time.time_ns() // 1_000_000
+    cached_ms, cached = _timestamp_cache
+    if now_ms != cached_ms:
+        seconds, ms = divmod(now_ms, 1000)
+        cached = datetime.fromtimestamp(seconds).replace(microsecond=ms * 1000).isoformat(timespec="milliseconds")
+        _timestamp_cache = (now_ms, cached)
+    return cached
+
+# Transaction ids formatted ahead of time from one os.urandom read per block
+_transaction_ids = []
+_transaction_ids_lock = threading.Lock()
+
+def _draw_transaction_ids(n: int = 1024) -> List[str]:
+    """Format n random version 4 UUIDs as 32-character hex strings without creating UUID objects"""
+    raw = bytearray(os.urandom(16 * n))
+    raw[6::16] = bytes(b & 0x0F | 0x40 for b in raw[6::16])
+    raw[8::16] = bytes(b & 0x3F | 0x80 for b in raw[8::16])
+    h = raw.hex()
+    return [h[i:i + 32] for i in range(0, 32 * n, 32)]
+
+def new_transaction_id() -> str:
+    """Random version 4 UUID, as undashed hex, for a new transaction"""
+    global _transaction_ids
+    with _transaction_ids_lock:
+        if not _transaction_ids:
+            _transaction_ids = _draw_transaction_ids()
+        return _transaction_ids.pop()
+
+class SampleBuffer:
+    """Random values drawn in bulk with NumPy and handed out one at a time"""
+
+    def __init__(self, draw, size: int = 10_000, pool: Sequence[str] | None = None):
+        self.draw = draw
+        self.size = size
+        self.pool = pool
+        self.rng = np.random.default_rng()
+        self.values = []
+        self.lock = threading.Lock()
+
+    def next(self):
+        with self.lock:
+            if not self.values:
+                self.values = self.draw(self.rng, self.size).tolist()
+                if self.pool:
+                    # Draws are indices, so every sample reuses the pool's strings
+                    self.values = [self.pool[i] for i in self.values]
+            return self.values.pop()
+
 class TransactionGeneratorService:
+    # High-risk jurisdictions for international transfers
+    high_risk_jurisdictions = ('Dubai', 'Bahrain', 'Thailand', 'Cayman Islands', 'Panama')
+
+    # Indian fraud locations
+    indian_fraud_locations = ('Jamtara', 'Bharatpur', 'Alwar', 'Mewat', 'Nuh')
+
+    normal_locations = (
+        'New York, New York', 'Los Angeles, California', 'Chicago, Illinois', 'Houston, Texas',
+        'Phoenix, Arizona', 'Philadelphia, Pennsylvania', 'San Antonio, Texas', 'San Diego, California',
+        'Dallas, Texas', 'San Jose, California', 'Austin, Texas', 'Jacksonville, Florida',
+        'Fort Worth, Texas', 'Columbus, Ohio', 'Charlotte, North Carolina', 'San Francisco, California',
+        'Indianapolis, Indiana', 'Seattle, Washington', 'Denver, Colorado', 'Washington, District of Columbia',
+        'Boston, Massachusetts', 'El Paso, Texas', 'Nashville, Tennessee', 'Detroit, Michigan',
+        'Oklahoma City, Oklahoma', 'Portland, Oregon', 'Las Vegas, Nevada', 'Memphis, Tennessee',
+        'Louisville, Kentucky', 'Baltimore, Maryland', 'Milwaukee, Wisconsin', 'Albuquerque, New Mexico',
+        'Tucson, Arizona', 'Fresno, California', 'Sacramento, California', 'Mesa, Arizona',
+        'Kansas City, Missouri', 'Atlanta, Georgia', 'Long Beach, California', 'Colorado Springs, Colorado',
+        'Raleigh, North Carolina', 'Miami, Florida', 'Virginia Beach, Virginia', 'Omaha, Nebraska',
+        'Oakland, California', 'Minneapolis, Minnesota', 'Tulsa, Oklahoma', 'Arlington, Texas'
+    )
+
+    # Transaction types, matching the ones offered for manual transactions
+    transaction_types = ('transfer', 'payment', 'deposit', 'withdrawal')
+
     def __init__(self, graph_service: GraphService, fraud_service: FraudService):
         self.graph_service = graph_service
         self.fraud_service = fraud_service
         self.is_running = False
         self.max_generation_rate = get_stored_max_transaction_rate()
         self.generation_rate = 1  # transactions per second
-        self.generated_transactions = []
+        # Only the most recent transactions are kept; total_generated counts all of them
+        self.generated_transactions = deque(maxlen=1000)
+        self.total_generated = 0
         self.transaction_counter = 0
+        self.counter_lock = threading.Lock()  # Request threads create transactions concurrently
         self.task = None
         self.account_vertices = []
+        # Accounts can change under a running generator (bulk loads), so the ids are reloaded periodically
+        self.account_refresh_interval = 300.0
+        self.accounts_expiry = 0.0
+        self.accounts_version = None  # graph_service.data_version the ids were loaded at
+        self.accounts_lock = threading.Lock()
+        self.fraud_slots = threading.BoundedSemaphore(int(os.environ.get('MAX_PENDING_FRAUD_CHECKS', 256)))
         self.start_time = None
 
-        # High-risk jurisdictions for international transfers
-        self.high_risk_jurisdictions = ['Dubai', 'Bahrain', 'Thailand', 'Cayman Islands', 'Panama']
-        
-        # Indian fraud locations
-        self.indian_fraud_locations = ['Jamtara', 'Bharatpur', 'Alwar', 'Mewat', 'Nuh']
-        
-        # Normal locations (Indian cities)
-        # self.normal_locations = [
-        #     'Mumbai, Maharashtra', 'Delhi, Delhi', 'Bangalore, Karnataka', 'Hyderabad, Telangana', 
-        #     'Chennai, Tamil Nadu', 'Kolkata, West Bengal', 'Pune, Maharashtra', 'Ahmedabad, Gujarat',
-        #     'Jaipur, Rajasthan', 'Surat, Gujarat', 'Lucknow, Uttar Pradesh', 'Kanpur, Uttar Pradesh',
-        #     'Nagpur, Maharashtra', 'Visakhapatnam, Andhra Pradesh', 'Indore, Madhya Pradesh',
-        #     'Thane, Maharashtra', 'Bhopal, Madhya Pradesh', 'Patna, Bihar', 'Vadodara, Gujarat',
-        #     'Ghaziabad, Uttar Pradesh', 'Ludhiana, Punjab', 'Agra, Uttar Pradesh', 'Nashik, Maharashtra'
-        # ]
-        
-        self.normal_locations = [
-            'New York, New York', 'Los Angeles, California', 'Chicago, Illinois', 'Houston, Texas',
-            'Phoenix, Arizona', 'Philadelphia, Pennsylvania', 'San Antonio, Texas', 'San Diego, California',
-            'Dallas, Texas', 'San Jose, California', 'Austin, Texas', 'Jacksonville, Florida',
-            'Fort Worth, Texas', 'Columbus, Ohio', 'Charlotte, North Carolina', 'San Francisco, California',
-            'Indianapolis, Indiana', 'Seattle, Washington', 'Denver, Colorado', 'Washington, District of Columbia',
-            'Boston, Massachusetts', 'El Paso, Texas', 'Nashville, Tennessee', 'Detroit, Michigan',
-            'Oklahoma City, Oklahoma', 'Portland, Oregon', 'Las Vegas, Nevada', 'Memphis, Tennessee',
-            'Louisville, Kentucky', 'Baltimore, Maryland', 'Milwaukee, Wisconsin', 'Albuquerque, New Mexico',
-            'Tucson, Arizona', 'Fresno, California', 'Sacramento, California', 'Mesa, Arizona',
-            'Kansas City, Missouri', 'Atlanta, Georgia', 'Long Beach, California', 'Colorado Springs, Colorado',
-            'Raleigh, North Carolina', 'Miami, Florida', 'Virginia Beach, Virginia', 'Omaha, Nebraska',
-            'Oakland, California', 'Minneapolis, Minnesota', 'Tulsa, Oklahoma', 'Arlington, Texas'
-        ]
-        
-        # Transaction types
-        self.transaction_types = ['purchase', 'transfer', 'withdrawal', 'deposit', 'payment']
+        # Concurrent requests share one addE traversal per batch
+        self.edge_batcher = MicroBatcher(
+            "transactions",
+            self._insert_transactions,
+            max_batch_size=int(os.environ.get('TRANSACTION_BATCH_SIZE', 64)),
+            max_wait_ms=float(os.environ.get('TRANSACTION_BATCH_WAIT_MS', 5))
+        )
+
+        # Per-transaction random fields, pre-drawn in bulk
+        self.amount_samples = SampleBuffer(lambda rng, n: rng.uniform(100.0, 15000.0, n))
+        self.type_samples = SampleBuffer(lambda rng, n: rng.integers(0, len(self.transaction_types), n), pool=self.transaction_types)
+        self.location_samples = SampleBuffer(lambda rng, n: rng.integers(0, len(self.normal_locations), n), pool=self.normal_locations)
 
 
     # ----------------------------------------------------------------------------------------------------------
@@ -100,9 +191,8 @@ class TransactionGeneratorService:
         try:
             old_rate = self.max_generation_rate
             
-            file = open('store.pckl', 'wb')
-            pickle.dump({ "rate": new_rate }, file)
-            file.close()
+            with open(STORE_PATH, 'w') as file:
+                json.dump({"rate": new_rate}, file)
 
             self.max_generation_rate = new_rate
             
@@ -119,7 +209,9 @@ class TransactionGeneratorService:
             logger.warning("Transaction generation is already running")
             return False
         try:
-            self.account_vertices = self.graph_service.client.V().has_label("account").id_().to_list()
+            # Reuse the loaded account ids while they are fresh
+            if len(self.account_vertices) < 2 or self._accounts_stale():
+                self._load_accounts()
             if len(self.account_vertices) < 1:
                 raise Exception("No accounts available")
         except Exception as e:
@@ -182,88 +274,230 @@ class TransactionGeneratorService:
     # ----------------------------------------------------------------------------------------------------------
 
        
-    def create_manual_transaction(self, from_id: str, to_id: str, amount: float, type: str = "transfer", gen_type: str = "MANUAL") -> Dict[str, Any]:
-        """Create a manual transaction between specified accounts"""
+    def create_manual_transaction(self, from_id: str, to_id: str, amount: float, type: str = "transfer", gen_type: str = "MANUAL") -> Tuple[Optional[str], Optional[str], Optional[str]]:
+        """
+        Create a manual transaction between specified accounts
+
+        Returns (txn_id, error, warning). A transaction that could not be stored gives
+        (None, error, None). Once stored it gives (txn_id, None, None), or
+        (txn_id, None, warning) if its fraud detection failed, since the transaction
+        itself exists either way.
+        """
+        logger.info("Creating %s transaction from %s to %s amount %s", gen_type.lower(), from_id, to_id, amount)
+        # Prevent self-transactions; account existence is checked by the insert traversal itself
+        if from_id == to_id:
+            return self._transaction_failed("Source and destination accounts cannot be the same")
+
+        # Create transaction
+        txn_id = new_transaction_id()
+        transaction = {
+            "txn_id": txn_id,
+            "from_id": from_id,
+            "to_id": to_id,
+            "amount": round(amount, 2),
+            "type": type,
+            "location": self.location_samples.next(),
+            "timestamp": current_timestamp(),
+            "gen_type": gen_type
+        }
         try:
-            logger.info(f"Creating {gen_type.lower()} transaction from {from_id} to {to_id} amount {amount}")
-            # Validate accounts exist
-            if not self._validate_account_exists(from_id):
-                raise Exception(f"Source account {from_id} not found")
-            if not self._validate_account_exists(to_id):
-                raise Exception(f"Destination account {to_id} not found")
-            # Prevent self-transactions
-            if from_id == to_id:
-                raise Exception("Source and destination accounts cannot be the same")
-
-            # Create transaction
-            txn_id = str(uuid.uuid4())
-            edge_id = (self.graph_service.client.V(from_id)
-                .addE("TRANSACTS")
-                .to(__.V(to_id))
-                .property("txn_id", txn_id)
-                .property("amount", round(amount, 2))
-                .property("currency", "USD")
-                .property("type", type)
-                .property("method", "electronic_transfer")
-                .property("location", random.choice(self.normal_locations))
-                .property("timestamp", datetime.now().isoformat())
-                .property("status", "completed")
-                .property("gen_type", gen_type)
-                .id_()
-                .next())
-            
-            self.transaction_counter += 1
-            logger.info(f"✅ Transaction {txn_id} stored in graph database with both sender and receiver edges")
-                       
-            # Run fraud detection
-            try:
-                self.fraud_service.run_fraud_detection(edge_id, txn_id)
-                logger.info(f"✅ {gen_type} transaction created: {txn_id} from {from_id} to {to_id} amount {amount}")
-            except Exception as e:
-                raise Exception(f"Error running fraud detection: {e}")
-            
-            return True
+            edge_id = self.edge_batcher.submit_and_wait(transaction)
+        except LookupError as e:
+            return self._transaction_failed(str(e))
+        except Exception as e:
+            return self._transaction_failed(f"Error storing transaction in graph: {e}")
         
+        with self.counter_lock:
+            self.transaction_counter += 1
+            self.total_generated += 1
+        # The insert is finished with the row, so it is kept as the recent-transaction record as is
+        transaction["edge_id"] = edge_id
+        self.generated_transactions.append(transaction)
+        logger.info("✅ Transaction %s stored in graph database with both sender and receiver edges", txn_id)
+                   
+        # Run fraud detection; AUTO transactions do not wait for the result
+        try:
+            if gen_type == "AUTO":
+                self._submit_background_fraud_detection(edge_id, txn_id)
+            else:
+                self.fraud_service.wait_for_fraud_detection(edge_id, txn_id)
         except Exception as e:
-            logger.error(f"❌ Error creating manual transaction: {e}")
-            return {"success": False, "error": f"❌ Error creating manual transaction: {e}"}
+            warning = f"Error running fraud detection: {e}"
+            logger.warning("⚠️  Transaction %s created without fraud detection: %s", txn_id, warning)
+            return txn_id, None, warning
 
-    def generate_transaction(self) -> Dict[str, Any]:
+        logger.info("✅ %s transaction created: %s from %s to %s amount %s", gen_type, txn_id, from_id, to_id, amount)
+        return txn_id, None, None
+
+    def _transaction_failed(self, error: str) -> Tuple[None, str, None]:
+        """Log a failed transaction and build its result"""
+        logger.error("❌ Error creating transaction: %s", error)
+        return None, error, None
+
+    def generate_transaction(self) -> Tuple[Optional[str], Optional[str], Optional[str]]:
         """Generate a normal transaction between real users and accounts"""
-        try:
-            if len(self.account_vertices) < 1:
-                self.account_vertices = self.graph_service.client.V().has_label("account").id_().to_list()
-            if len(self.account_vertices) < 1:
-                raise Exception("No accounts available")
-            
-            # Get 2 random accounts from the graph database
-            sender_account_id, receiver_account_id = random.sample(self.account_vertices, 2)
-            
-            if not sender_account_id or not receiver_account_id:
-                logger.error("Could not get accounts from graph database. Cannot generate transaction without valid accounts.")
-                raise Exception("No valid accounts available in graph database for transaction generation")
-            
-            # Generate transaction data
-            amount = random.uniform(100.0, 15000.0)
-            transaction_type = random.choice(["transfer", "payment", "deposit", "withdrawal"])
-            
-            self.create_manual_transaction(sender_account_id, receiver_account_id, amount, transaction_type, "AUTO")
+        # Polling a running bulk load here is what notices it completing while generation runs
+        self.graph_service.is_bulk_load_running()
+        if self._accounts_stale():
+            if len(self.account_vertices) < 2:
+                error = self._load_missing_accounts()
+                if error:
+                    return self._transaction_failed(error)
+            else:
+                self._refresh_accounts()
+
+        # Get 2 distinct random accounts; the second index skips over the first
+        accounts = self.account_vertices
+        if len(accounts) < 2:
+            return self._transaction_failed("At least two accounts are required to generate a transaction")
+        sender_index = random.randrange(len(accounts))
+        receiver_index = random.randrange(len(accounts) - 1)
+        if receiver_index >= sender_index:
+            receiver_index += 1
+
+        # Generate transaction data
+        amount = self.amount_samples.next()
+        transaction_type = self.type_samples.next()
         
-        except Exception as e:
-            logger.error(f"Error generating normal transaction: {e}")
-            raise e
+        return self.create_manual_transaction(accounts[sender_index], accounts[receiver_index], amount, transaction_type, "AUTO")
         
-    def _validate_account_exists(self, account_id: str) -> bool:
-        """Validate that an account exists in the graph database"""
+    def _submit_background_fraud_detection(self, edge_id, txn_id: str):
+        """Queue fraud detection without waiting, blocking only when too many checks are in flight"""
+        self.fraud_slots.acquire()
+
+        def on_done(future):
+            self.fraud_slots.release()
+            if future.exception():
+                logger.error("❌ Error running fraud detection for transaction %s: %s", txn_id, future.exception())
+
         try:
-            if self.graph_service.client:
-                accounts = self.graph_service.client.V(str(account_id)).to_list()
-                return len(accounts) > 0
-            return False
-        
+            self.fraud_service.submit_fraud_detection(edge_id, txn_id).add_done_callback(on_done)
+        except Exception:
+            self.fraud_slots.release()
+            raise
+
+    def _add_transaction_edge(self, transaction: Dict[str, Any], source=__):
+        """Build the traversal that creates one TRANSACTS edge, anonymous unless a source is given"""
+        # Both ends must be existing accounts, otherwise the traversal adds nothing and returns no id
+        edge = (source.V(transaction["from_id"]).has_label("account").as_("sender")
+            .V(transaction["to_id"]).has_label("account")
+            .add_e("TRANSACTS").from_("sender"))
+        # property() mutates and returns the same traversal, so one bound method serves every step
+        add_property = edge.property
+        for key in TRANSACTION_PROPERTIES:
+            add_property(key, transaction[key])
+        for key, value in CONSTANT_TRANSACTION_PROPERTIES:
+            add_property(key, value)
+        return edge
+
+    def _insert_transactions(self, transactions: List[Dict[str, Any]]) -> List[Any]:
+        """
+        Insert a batch of TRANSACTS edges with one traversal and return their edge ids
+
+        Each edge is created inside its own side effect, so a row whose accounts
+        are missing yields no id instead of failing the rest of the batch.
+        """
+        # Resolve the client and builder once per batch rather than once per row
+        client = self.graph_service.client
+        add_edge = self._add_transaction_edge
+
+        if len(transactions) == 1:
+            # A lone row needs none of the side effect plumbing; send the plain addE traversal
+            transaction = transactions[0]
+            ids = add_edge(transaction, client).id_().to_list()
+            if ids:
+                return [ids[0]]
+            return [self._missing_account_error(transaction)]
+
+        traversal = client.inject(0)
+        labels = [f"e{i}" for i in range(len(transactions))]
+        for label, transaction in zip(labels, transactions):
+            traversal = traversal.side_effect(add_edge(transaction).id_().aggregate(Scope.local, label))
+
+        edge_ids = traversal.cap(*labels).next()
+
+        results = []
+        for label, transaction in zip(labels, transactions):
+            ids = edge_ids.get(label) or []
+            if ids:
+                results.append(ids[0])
+            else:
+                results.append(self._missing_account_error(transaction))
+        return results
+
+    def _missing_account_error(self, transaction: Dict[str, Any]) -> LookupError:
+        """Name the missing account of a failed insert; the existence query only runs on this failure path"""
+        from_id, to_id = transaction["from_id"], transaction["to_id"]
+        try:
+            found = set(self.graph_service.client.V(from_id, to_id).has_label("account").id_().to_list())
         except Exception as e:
-            logger.error(f"Error validating account {account_id}: {e}")
-            return False
+            logger.error("❌ Unable to check accounts %s and %s: %s", from_id, to_id, e)
+            found = None
+
+        if found is not None and from_id not in found:
+            return LookupError(f"Source account {from_id} not found")
+        if found is not None and to_id not in found:
+            return LookupError(f"Destination account {to_id} not found")
+        return LookupError(f"Account {from_id} or {to_id} not found")
+
+    def _load_accounts(self):
+        """Load the account ids from the graph database in one request"""
+        loading = self.graph_service.is_bulk_load_running()
+        version = self.graph_service.data_version
+        # One traversal sees a single consistent scan, and fold() returns it as one list result.
+        # The limit keeps that result well under the driver's 4 MB message size (about 1.3 MB of ids).
+        # Ids are deduplicated so the distinct-index pick can never yield the same account twice
+        accounts = list(dict.fromkeys(self.graph_service.client.V().has_label("account").limit(100_000).id_().fold().next()))
+        # Swap in the finished list so concurrent generators never sample a partial one
+        self.account_vertices = accounts
+        self.accounts_version = version
+
+        if len(accounts) < 2:
+            # Nothing to sample yet, so this is retried after the next status check rather than the full interval
+            self.accounts_expiry = time.monotonic() + self.graph_service.bulk_load_status_interval
+        elif loading:
+            # Ids read from a graph that is still being loaded are only kept until the next status check
+            self.accounts_expiry = time.monotonic() + self.graph_service.bulk_load_status_interval
+        else:
+            self.accounts_expiry = time.monotonic() + self.account_refresh_interval
+
+    def _accounts_stale(self) -> bool:
+        """Whether the account ids have expired or were loaded before the last completed bulk load"""
+        return time.monotonic() >= self.accounts_expiry or self.accounts_version != self.graph_service.data_version
+
+    def _load_missing_accounts(self) -> Optional[str]:
+        """
+        Load the account ids inline when there are too few to sample
+
+        Concurrent requests wait for the one load instead of each starting a scan, and a
+        failed or too-small load is only retried once the bulk load status interval passes.
+        Returns an error message if the load failed.
+        """
+        with self.accounts_lock:
+            if not self._accounts_stale():
+                return None
+            try:
+                self._load_accounts()
+            except Exception as e:
+                self.accounts_expiry = time.monotonic() + self.graph_service.bulk_load_status_interval
+                self.accounts_version = self.graph_service.data_version
+                return f"Unable to load accounts: {e}"
+        return None
+
+    def _refresh_accounts(self):
+        """Reload the account ids on the graph executor while generation keeps sampling the current list"""
+        with self.accounts_lock:
+            if not self._accounts_stale():
+                return
+            # Push the expiry out first so a failing reload is retried once per interval, not per transaction
+            self.accounts_expiry = time.monotonic() + self.account_refresh_interval
+            self.accounts_version = self.graph_service.data_version
+
+        def on_done(future):
+            if future.exception():
+                logger.error("❌ Unable to refresh accounts: %s", future.exception())
+
+        self.graph_service.executor.submit(self._load_accounts).add_done_callback(on_done)
 
 
     # ----------------------------------------------------------------------------------------------------------
@@ -273,14 +507,14 @@ class TransactionGeneratorService:
 
     def get_recent_transactions(self, limit: int = 10) -> List[Dict[str, Any]]:
         """Get recent transactions generated by this service"""
-        return self.generated_transactions[-limit:]
+        return list(islice(self.generated_transactions, max(0, len(self.generated_transactions) - limit), None))
 
     def get_status(self) -> Dict[str, Any]:
         """Get current status of transaction generation"""
         return {
             "status": "running" if self.is_running else "stopped",
             "generation_rate": self.generation_rate,
-            "total_generated": len(self.generated_transactions),
+            "total_generated": self.total_generated,
             "transaction_count": self.transaction_counter,
             "last_10_transactions": self.get_recent_transactions(10),
             "start_time": self.start_time
@@ -291,7 +525,7 @@ class TransactionGeneratorService:
         return {
             "is_running": self.is_running,
             "generation_rate": self.generation_rate,
-            "total_generated": len(self.generated_transactions),
+            "total_generated": self.total_generated,
             "transaction_count": self.transaction_counter,
             "start_time": self.start_time
         }
@@ -302,40 +536,15 @@ class TransactionGeneratorService:
     # ----------------------------------------------------------------------------------------------------------
 
 
-    def _log_transaction(self, transaction: Dict[str, Any], transaction_type: str = "TRANSACTION"):
-        """Log transaction details to appropriate log files"""
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        
-        # Create detailed log message
-        log_data = {
-            "timestamp": timestamp,
-            "transaction_id": transaction['id'],
-            "user_id": transaction.get('user_id', ''),
-            "account_id": transaction['sndr_id'],
-            "receiver_user_id": transaction.get('recr_user_id'),
-            "receiver_account_id": transaction.get('receiver_account_id'),
-            "amount": transaction['amount'],
-            "currency": transaction['currency'],
-            "transaction_type": transaction['txn_type'],
-
-            "location": transaction['location'],
-            "status": transaction['status']
-        }
-        
-        # Log to main transaction log
-        logger.info(f"{transaction_type}: {json.dumps(log_data, indent=2)}")
-        
-        # Log basic transaction info
-        transaction_log_msg = f"ID: {transaction['id']} | Amount: ₹{transaction['amount']} | Type: {transaction['transaction_type']} | Location: {transaction['location']}"
-        logger.info(f"TRANSACTION: {transaction_log_msg}")
-
     def _log_statistics(self):
         """Log current statistics"""
+        if not stats_logger.isEnabledFor(logging.INFO):
+            return
+        # The handler's %(asctime)s already stamps the record
         stats_data = {
-            "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
             "total_transactions": self.transaction_counter,
             "generation_rate": self.generation_rate,
             "is_running": self.is_running
         }
         
-        stats_logger.info(f"STATISTICS: {json.dumps(stats_data, indent=2)}")
\ No newline at end of file
+        stats_logger.info("STATISTICS: %s", json.dumps(stats_data, separators=(',', ':')))
\ No newline at end of file
@@ -0,0 +1,136 @@
+import threading
+import time
+from concurrent.futures import Future
+
+from services.transaction_generator import TransactionGeneratorService
+
+
+class FakeTraversal:
+    def __init__(self, graph):
+        self.graph = graph
+
+    def __getattr__(self, name):
+        # V(), has_label(), limit() and id_() only build the traversal
+        return lambda *args: self
+
+    def fold(self):
+        return self
+
+    def next(self):
+        return self.graph.scan()
+
+
+class InlineExecutor:
+    def submit(self, fn):
+        future = Future()
+        try:
+            future.set_result(fn())
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+
+class FakeGraphService:
+    def __init__(self, accounts=()):
+        self.accounts = list(accounts)
+        self.data_version = 0
+        self.loading = False
+        self.bulk_load_status_interval = 5.0
+        self.scans = 0
+        self.scan_delay = 0
+        self.scan_error = None
+        self.client = FakeTraversal(self)
+        self.executor = InlineExecutor()
+
+    def is_bulk_load_running(self):
+        return self.loading
+
+    def scan(self):
+        self.scans += 1
+        time.sleep(self.scan_delay)
+        if self.scan_error:
+            raise self.scan_error
+        return list(self.accounts)
+
+
+def make_generator(graph):
+    return TransactionGeneratorService(graph, fraud_service=None)
+
+
+def test_empty_graph_is_scanned_once_per_retry_interval():
+    graph = FakeGraphService()
+    generator = make_generator(graph)
+
+    for _ in range(5):
+        txn_id, error, _ = generator.generate_transaction()
+        assert txn_id is None and "At least two accounts" in error
+    assert graph.scans == 1
+
+    # Once the retry interval passes the ids are loaded again
+    generator.accounts_expiry = 0.0
+    generator.generate_transaction()
+    assert graph.scans == 2
+
+
+def test_failed_load_is_retried_after_interval():
+    graph = FakeGraphService()
+    graph.scan_error = RuntimeError("graph down")
+    generator = make_generator(graph)
+
+    txn_id, error, _ = generator.generate_transaction()
+    assert txn_id is None and "Unable to load accounts" in error
+    generator.generate_transaction()
+    assert graph.scans == 1
+    assert generator.accounts_expiry <= time.monotonic() + graph.bulk_load_status_interval
+
+
+def test_concurrent_requests_share_one_inline_load():
+    graph = FakeGraphService()
+    graph.scan_delay = 0.1
+    generator = make_generator(graph)
+
+    threads = [threading.Thread(target=generator.generate_transaction) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert graph.scans == 1
+
+
+def test_loaded_ids_are_kept_for_refresh_interval():
+    graph = FakeGraphService(["A1", "A2", "A2", "A3"])
+    generator = make_generator(graph)
+
+    generator._load_accounts()
+
+    assert generator.account_vertices == ["A1", "A2", "A3"]
+    assert not generator._accounts_stale()
+    assert generator.accounts_expiry > time.monotonic() + graph.bulk_load_status_interval
+
+
+def test_ids_read_during_bulk_load_expire_at_next_status_check():
+    graph = FakeGraphService(["A1", "A2"])
+    graph.loading = True
+    generator = make_generator(graph)
+
+    generator._load_accounts()
+
+    assert generator.accounts_expiry <= time.monotonic() + graph.bulk_load_status_interval
+
+
+def test_data_version_bump_triggers_one_background_reload():
+    graph = FakeGraphService(["A1", "A2"])
+    generator = make_generator(graph)
+    generator._load_accounts()
+
+    graph.accounts = ["A1", "A2", "A3"]
+    graph.data_version += 1
+    assert generator._accounts_stale()
+
+    generator._refresh_accounts()
+    generator._refresh_accounts()
+
+    assert graph.scans == 2
+    assert generator.account_vertices == ["A1", "A2", "A3"]
+    assert not generator._accounts_stale()
@@ -0,0 +1,71 @@
+from services.graph_service import CachedRead
+
+
+class FakeGraphService:
+    def __init__(self):
+        self.data_version = 0
+        self.loading = False
+
+    def is_bulk_load_running(self):
+        return self.loading
+
+
+class CountingRead:
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return self.calls
+
+
+def test_reuses_read_within_ttl():
+    read = CountingRead()
+    cached = CachedRead(FakeGraphService(), 60, read)
+
+    assert cached.get() == 1
+    assert cached.get() == 1
+    assert read.calls == 1
+
+
+def test_data_version_bump_invalidates():
+    graph = FakeGraphService()
+    read = CountingRead()
+    cached = CachedRead(graph, 60, read)
+
+    assert cached.get() == 1
+    graph.data_version += 1
+    assert cached.get() == 2
+    assert cached.get() == 2
+    assert read.calls == 2
+
+
+def test_expired_entry_is_reread():
+    read = CountingRead()
+    cached = CachedRead(FakeGraphService(), 0, read)
+
+    assert cached.get() == 1
+    assert cached.get() == 2
+
+
+def test_read_during_bulk_load_is_not_cached():
+    graph = FakeGraphService()
+    graph.loading = True
+    read = CountingRead()
+    cached = CachedRead(graph, 60, read)
+
+    assert cached.get() == 1
+    assert cached.get() == 2
+
+    graph.loading = False
+    assert cached.get() == 3
+    assert cached.get() == 3
+
+
+def test_clear_drops_entry():
+    read = CountingRead()
+    cached = CachedRead(FakeGraphService(), 60, read)
+
+    cached.get()
+    cached.clear()
+    assert cached.get() == 2
@@ -0,0 +1,80 @@
+import threading
+import time
+
+import pytest
+
+from services.micro_batcher import MicroBatcher
+
+
+def test_flushes_when_batch_is_full():
+    batches = []
+    batcher = MicroBatcher("test", lambda items: batches.append(items) or [i * 2 for i in items],
+                           max_batch_size=3, max_wait_ms=10_000)
+
+    futures = [batcher.submit(i) for i in range(3)]
+
+    assert [f.result(timeout=1) for f in futures] == [0, 2, 4]
+    assert batches == [[0, 1, 2]]
+
+
+def test_flushes_partial_batch_after_max_wait():
+    batches = []
+    batcher = MicroBatcher("test", lambda items: batches.append(items) or items,
+                           max_batch_size=64, max_wait_ms=20)
+
+    start = time.monotonic()
+    assert batcher.submit_and_wait("a") == "a"
+    assert time.monotonic() - start < 1
+    assert batches == [["a"]]
+
+
+def test_exception_result_fails_only_its_item():
+    batcher = MicroBatcher("test", lambda items: [LookupError(i) if i == "bad" else i for i in items],
+                           max_batch_size=2, max_wait_ms=10_000)
+
+    good, bad = batcher.submit("good"), batcher.submit("bad")
+
+    assert good.result(timeout=1) == "good"
+    with pytest.raises(LookupError):
+        bad.result(timeout=1)
+
+
+def test_handler_exception_fails_whole_batch_and_worker_survives():
+    calls = []
+
+    def handler(items):
+        calls.append(items)
+        if len(calls) == 1:
+            raise ValueError("boom")
+        return items
+
+    batcher = MicroBatcher("test", handler, max_batch_size=2, max_wait_ms=10_000)
+
+    futures = [batcher.submit(1), batcher.submit(2)]
+    for future in futures:
+        with pytest.raises(ValueError, match="boom"):
+            future.result(timeout=1)
+
+    assert [f.result(timeout=1) for f in (batcher.submit(3), batcher.submit(4))] == [3, 4]
+
+
+def test_result_count_mismatch_fails_batch():
+    batcher = MicroBatcher("test", lambda items: [], max_batch_size=1)
+
+    with pytest.raises(RuntimeError):
+        batcher.submit_and_wait("a")
+
+
+def test_submit_and_wait_times_out():
+    release = threading.Event()
+
+    def handler(items):
+        release.wait(5)
+        return items
+
+    batcher = MicroBatcher("test", handler, max_batch_size=1, result_timeout=0.05)
+    try:
+        with pytest.raises(TimeoutError, match="not ready after"):
+            batcher.submit_and_wait("a")
+    finally:
+        release.set()